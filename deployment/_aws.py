@@ -0,0 +1,24 @@
+"""boto3 session and client settings shared by the scripts in this directory."""
+
+import functools
+import boto3
+from botocore.config import Config
+
+BOTO_CONFIG = Config(
+    retries={"max_attempts": 10, "mode": "adaptive"},
+    max_pool_connections=20,
+    tcp_keepalive=True,
+)
+
+
+@functools.lru_cache(maxsize=None)
+def session(region):
+    """Get boto3 session for region (shared by all clients in this process)."""
+    return boto3.Session(region_name=region)
+
+
+@functools.lru_cache(maxsize=None)
+def account_id(region):
+    """Get AWS account ID (one STS call per region and process)."""
+    sts_client = session(region).client("sts", config=BOTO_CONFIG)
+    return sts_client.get_caller_identity()["Account"]
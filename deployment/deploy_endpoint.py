@@ -2,9 +2,11 @@
 """Deploy SageMaker endpoint."""
 
 import argparse
-import boto3
+import functools
+import os
 import time
-
+from pathlib import Path
+import _aws
 
 def deploy_endpoint(
     model_package_arn,
@@ -18,11 +20,15 @@ def deploy_endpoint(
 ):
     """Deploy SageMaker endpoint."""
     
-    sm_client = boto3.client("sagemaker", region_name=region)
+    sm_client = _aws.session(region).client("sagemaker", config=_aws.BOTO_CONFIG)
     
-    # Create model from model package
-    model_name = f"{endpoint_name}-model-{int(time.time())}"
+    # Resource names share one timestamp
+    timestamp = int(time.time())
+    model_name = f"{endpoint_name}-model-{timestamp}"
+    endpoint_config_name = f"{endpoint_name}-config-{timestamp}"
+    capture_uri = f"s3://sagemaker-{region}-{_aws.account_id(region)}/data-capture/{endpoint_name}"
     
+    # Create model from model package
     print(f"Creating model: {model_name}")
     sm_client.create_model(
         ModelName=model_name,
@@ -35,8 +41,6 @@ def deploy_endpoint(
     )
     
     # Create endpoint configuration
-    endpoint_config_name = f"{endpoint_name}-config-{int(time.time())}"
-    
     print(f"Creating endpoint configuration: {endpoint_config_name}")
     sm_client.create_endpoint_config(
         EndpointConfigName=endpoint_config_name,
@@ -52,7 +56,7 @@ def deploy_endpoint(
         DataCaptureConfig={
             "EnableCapture": True,
             "InitialSamplingPercentage": 100,
-            "DestinationS3Uri": f"s3://sagemaker-{region}-{boto3.client('sts').get_caller_identity()['Account']}/data-capture/{endpoint_name}",
+            "DestinationS3Uri": capture_uri,
             "CaptureOptions": [
                 {"CaptureMode": "Input"},
                 {"CaptureMode": "Output"},
@@ -61,16 +65,19 @@ def deploy_endpoint(
     )
     
     # Create or update endpoint
-    try:
-        print(f"Checking if endpoint exists: {endpoint_name}")
-        sm_client.describe_endpoint(EndpointName=endpoint_name)
-        
+    print(f"Checking if endpoint exists: {endpoint_name}")
+    paginator = sm_client.get_paginator("list_endpoints")
+    existing = set(
+        paginator.paginate(NameContains=endpoint_name).search("Endpoints[].EndpointName")
+    )
+    
+    if endpoint_name in existing:
         print(f"Updating existing endpoint: {endpoint_name}")
         sm_client.update_endpoint(
             EndpointName=endpoint_name,
             EndpointConfigName=endpoint_config_name,
         )
-    except sm_client.exceptions.ClientError:
+    else:
         print(f"Creating new endpoint: {endpoint_name}")
         sm_client.create_endpoint(
             EndpointName=endpoint_name,
@@ -80,7 +87,9 @@ def deploy_endpoint(
     # Enable autoscaling if requested
     if enable_autoscaling:
         print(f"Configuring autoscaling for endpoint: {endpoint_name}")
-        autoscaling_client = boto3.client("application-autoscaling", region_name=region)
+        autoscaling_client = _aws.session(region).client(
+            "application-autoscaling", config=_aws.BOTO_CONFIG
+        )
         
         resource_id = f"endpoint/{endpoint_name}/variant/AllTraffic"
         
@@ -109,25 +118,21 @@ def deploy_endpoint(
         )
     
     # Save endpoint name
-    with open("endpoint_name.txt", "w") as f:
-        f.write(endpoint_name)
+    Path("endpoint_name.txt").write_text(endpoint_name)
     
     print(f"Endpoint deployment initiated: {endpoint_name}")
     
     return endpoint_name
 
 
+@functools.lru_cache(maxsize=None)
 def get_execution_role(region):
-    """Get SageMaker execution role."""
-    sts_client = boto3.client("sts")
-    account_id = sts_client.get_caller_identity()["Account"]
-    
+    """Get SageMaker execution role (memoized per region)."""
     # Try to get role from environment or use default
-    import os
     role_arn = os.environ.get("SAGEMAKER_EXECUTION_ROLE_ARN")
     
     if not role_arn:
-        role_arn = f"arn:aws:iam::{account_id}:role/SageMakerExecutionRole"
+        role_arn = f"arn:aws:iam::{_aws.account_id(region)}:role/SageMakerExecutionRole"
     
     return role_arn
 
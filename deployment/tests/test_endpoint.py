@@ -2,16 +2,182 @@
 """Test SageMaker endpoint."""
 
 import argparse
+import asyncio
+import functools
 import json
 import time
 import boto3
 import numpy as np
+from botocore.config import Config
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
 
+_BOTO_CONFIG = Config(
+    retries={"max_attempts": 5, "mode": "adaptive"},
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    connect_timeout=2,
+    read_timeout=30,
+)
 
-def test_endpoint(endpoint_name, test_data_file, region):
-    """Test endpoint with sample data."""
+# Recreate async clients before their request signing goes stale
+ASYNC_CLIENT_MAX_AGE = 240  # seconds
+
+
+@functools.lru_cache(maxsize=None)
+def _runtime_client(region):
+    """Get sagemaker-runtime client for region (created once per process)."""
+    session = boto3.session.Session(region_name=region)
+    return session.client("sagemaker-runtime", config=_BOTO_CONFIG)
+
+
+def _warm_up(runtime_client, endpoint_name, record):
+    """Send one untimed request so DNS/TLS setup doesn't skew latencies."""
+    try:
+        runtime_client.invoke_endpoint(
+            EndpointName=endpoint_name,
+            ContentType="text/csv",
+            Body=record,
+        )["Body"].read()
+    except Exception:
+        pass  # Real failures are reported by the timed requests
+
+
+def _split_predictions(body, batch_size):
+    """Split a text/csv response body into one raw (bytes) prediction per record."""
+    predictions = body.strip().splitlines()
+    
+    # Some containers answer a batch with a single comma-separated line
+    if len(predictions) == 1 and batch_size > 1:
+        predictions = predictions[0].split(b",")
+    
+    if len(predictions) != batch_size:
+        raise ValueError(f"Expected {batch_size} predictions, got {len(predictions)}")
+    
+    return [prediction.strip() for prediction in predictions]
+
+
+def _batch_outcomes(batch, outcome):
+    """Expand one batch result (or exception) into per-record outcomes."""
+    if isinstance(outcome, Exception):
+        return [outcome] * len(batch)
+    
+    predictions, latency = outcome
+    return [(prediction, latency) for prediction in predictions]
+
+
+def _invoke(runtime_client, endpoint_name, batch):
+    """Invoke endpoint with a multi-record CSV batch.
+    
+    Returns (predictions, latency_ms), latency being the batch latency
+    divided evenly across its records.
+    """
+    start_time = time.perf_counter_ns()
+    response = runtime_client.invoke_endpoint(
+        EndpointName=endpoint_name,
+        ContentType="text/csv",
+        Body="\n".join(batch),
+    )
+    latency = (time.perf_counter_ns() - start_time) / 1e6 / len(batch)  # ms
+    
+    predictions = _split_predictions(response["Body"].read(), len(batch))
+    
+    return predictions, latency
+
+
+def _invoke_all(endpoint_name, region, batches, max_workers):
+    """Invoke endpoint for all batches on a thread pool.
+    
+    Returns one (predictions, latency_ms) tuple or exception per batch.
+    """
+    # One client shared by all worker threads (botocore clients are thread-safe)
+    runtime_client = _runtime_client(region)
+    if batches:
+        _warm_up(runtime_client, endpoint_name, batches[0][0])
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(_invoke, runtime_client, endpoint_name, batch)
+            for batch in batches
+        ]
+    
+    return [future.exception() or future.result() for future in futures]
+
+
+async def _invoke_all_async(endpoint_name, region, batches, max_concurrency):
+    """Invoke endpoint for all batches with aiobotocore.
+    
+    Returns one (predictions, latency_ms) tuple or exception per batch.
+    """
+    try:
+        from aiobotocore.config import AioConfig
+        from aiobotocore.session import get_session
+    except ImportError:
+        raise ImportError("--use-async requires aiobotocore (pip install aiobotocore)") from None
     
-    runtime_client = boto3.client("sagemaker-runtime", region_name=region)
+    session = get_session()
+    config = AioConfig(max_pool_connections=max(max_concurrency, 10))
+    semaphore = asyncio.Semaphore(max_concurrency)
+    client_lock = asyncio.Lock()
+    clients = AsyncExitStack()
+    client = None
+    created_at = 0.0
+    
+    async def get_client():
+        nonlocal client, created_at
+        async with client_lock:
+            if client is None or time.monotonic() - created_at > ASYNC_CLIENT_MAX_AGE:
+                # Older clients may still have requests in flight, so every
+                # client stays open until the exit stack closes them all
+                client = await clients.enter_async_context(
+                    session.create_client("sagemaker-runtime", region_name=region, config=config)
+                )
+                created_at = time.monotonic()
+                
+                # Untimed request so DNS/TLS setup doesn't skew latencies
+                try:
+                    response = await client.invoke_endpoint(
+                        EndpointName=endpoint_name,
+                        ContentType="text/csv",
+                        Body=batches[0][0],
+                    )
+                    async with response["Body"] as stream:
+                        await stream.read()
+                except Exception:
+                    pass  # Real failures are reported by the timed requests
+            return client
+    
+    async def invoke(batch):
+        async with semaphore:
+            runtime_client = await get_client()
+            start_time = time.perf_counter_ns()
+            response = await runtime_client.invoke_endpoint(
+                EndpointName=endpoint_name,
+                ContentType="text/csv",
+                Body="\n".join(batch),
+            )
+            latency = (time.perf_counter_ns() - start_time) / 1e6 / len(batch)  # ms
+            
+            async with response["Body"] as stream:
+                predictions = _split_predictions(await stream.read(), len(batch))
+            
+            return predictions, latency
+    
+    async with clients:
+        return await asyncio.gather(
+            *(invoke(batch) for batch in batches), return_exceptions=True
+        )
+
+
+def test_endpoint(
+    endpoint_name,
+    test_data_file,
+    region,
+    max_workers=32,
+    use_async=False,
+    batch_size=32,
+):
+    """Test endpoint with sample data."""
     
     # Load test data
     with open(test_data_file, "r") as f:
@@ -29,25 +195,38 @@ def test_endpoint(endpoint_name, test_data_file, region):
     print(f"Testing endpoint: {endpoint_name}")
     print(f"Running {results['total_tests']} test cases...")
     
-    for i, sample in enumerate(test_data["samples"]):
+    # Invoke endpoint concurrently (I/O bound), batch_size records per request
+    payloads = [sample["input"] for sample in test_data["samples"]]
+    batches = [
+        payloads[start:start + batch_size]
+        for start in range(0, len(payloads), batch_size)
+    ]
+    if use_async:
+        batch_outcomes = asyncio.run(
+            _invoke_all_async(endpoint_name, region, batches, max_workers)
+        )
+    else:
+        batch_outcomes = _invoke_all(endpoint_name, region, batches, max_workers)
+    
+    outcomes = []
+    for batch, outcome in zip(batches, batch_outcomes):
+        outcomes.extend(_batch_outcomes(batch, outcome))
+    
+    # Latencies of successful invocations, filled in sample order
+    latencies = np.empty(len(payloads), dtype=np.float64)
+    n_latencies = 0
+    
+    for i, (sample, outcome) in enumerate(zip(test_data["samples"], outcomes)):
         try:
-            # Prepare payload
             payload = sample["input"]
             expected = sample.get("expected")
             
-            # Invoke endpoint
-            start_time = time.time()
-            response = runtime_client.invoke_endpoint(
-                EndpointName=endpoint_name,
-                ContentType="text/csv",
-                Body=payload,
-            )
-            latency = (time.time() - start_time) * 1000  # ms
-            
-            # Parse response
-            prediction = response["Body"].read().decode("utf-8").strip()
+            if isinstance(outcome, Exception):
+                raise outcome
+            prediction, latency = outcome
             
-            results["latencies"].append(latency)
+            latencies[n_latencies] = latency
+            n_latencies += 1
             results["predictions"].append({
                 "input": payload,
                 "prediction": prediction,
@@ -55,34 +234,41 @@ def test_endpoint(endpoint_name, test_data_file, region):
                 "latency_ms": latency,
             })
             
-            # Check if prediction matches expected (if provided)
+            # Check if prediction matches expected (if provided); predictions
+            # stay raw bytes and are only decoded for output
             if expected is not None:
-                if str(prediction) == str(expected):
+                if prediction == str(expected).encode("utf-8"):
                     results["passed"] += 1
                     print(f"  ✅ Test {i+1}: PASS (latency: {latency:.2f}ms)")
                 else:
                     results["failed"] += 1
                     results["success"] = False
-                    print(f"  ❌ Test {i+1}: FAIL - Expected {expected}, got {prediction}")
+                    print(f"  ❌ Test {i+1}: FAIL - Expected {expected}, got {prediction.decode('utf-8')}")
             else:
                 results["passed"] += 1
-                print(f"  ✅ Test {i+1}: PASS (latency: {latency:.2f}ms, prediction: {prediction})")
+                print(f"  ✅ Test {i+1}: PASS (latency: {latency:.2f}ms, prediction: {prediction.decode('utf-8')})")
         
         except Exception as e:
             results["failed"] += 1
             results["success"] = False
             print(f"  ❌ Test {i+1}: ERROR - {str(e)}")
     
-    # Calculate statistics
-    if results["latencies"]:
-        results["avg_latency_ms"] = np.mean(results["latencies"])
-        results["p50_latency_ms"] = np.percentile(results["latencies"], 50)
-        results["p95_latency_ms"] = np.percentile(results["latencies"], 95)
-        results["p99_latency_ms"] = np.percentile(results["latencies"], 99)
+    # Calculate statistics (all percentiles from a single sort)
+    latencies = latencies[:n_latencies]
+    results["latencies"] = latencies.tolist()
+    if n_latencies:
+        p50, p95, p99 = np.quantile(latencies, [0.5, 0.95, 0.99]).tolist()
+        results["avg_latency_ms"] = float(latencies.mean())
+        results["p50_latency_ms"] = p50
+        results["p95_latency_ms"] = p95
+        results["p99_latency_ms"] = p99
     
     results["accuracy"] = results["passed"] / results["total_tests"] if results["total_tests"] > 0 else 0
     
     # Save results
+    for entry in results["predictions"]:
+        entry["prediction"] = entry["prediction"].decode("utf-8")
+    
     with open("test_results.json", "w") as f:
         json.dump(results, f, indent=2)
     
@@ -109,7 +295,17 @@ if __name__ == "__main__":
     parser.add_argument("--endpoint-name", type=str, required=True)
     parser.add_argument("--test-data", type=str, required=True)
     parser.add_argument("--region", type=str, required=True)
+    parser.add_argument("--max-workers", type=int, default=32)
+    parser.add_argument("--use-async", action="store_true")
+    parser.add_argument("--batch-size", type=int, default=32)
     
     args = parser.parse_args()
     
-    test_endpoint(args.endpoint_name, args.test_data, args.region)
+    test_endpoint(
+        args.endpoint_name,
+        args.test_data,
+        args.region,
+        args.max_workers,
+        args.use_async,
+        args.batch_size,
+    )
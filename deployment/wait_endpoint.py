@@ -2,36 +2,40 @@
 """Wait for SageMaker endpoint to be in service."""
 
 import argparse
-import time
-import boto3
-
+from botocore.exceptions import WaiterError
+import _aws
 
 def wait_endpoint(endpoint_name, region, timeout=900):
     """Wait for endpoint to be in service."""
     
-    sm_client = boto3.client("sagemaker", region_name=region)
+    sm_client = _aws.session(region).client("sagemaker", config=_aws.BOTO_CONFIG)
     
-    start_time = time.time()
+    print(f"Waiting for endpoint: {endpoint_name}")
     
-    while True:
-        response = sm_client.describe_endpoint(EndpointName=endpoint_name)
-        
-        status = response["EndpointStatus"]
-        
-        print(f"Endpoint status: {status}")
-        
-        if status == "InService":
-            print(f"Endpoint is in service: {endpoint_name}")
-            return status
+    # Built-in waiter polls DescribeEndpoint and stops on InService/Failed
+    waiter = sm_client.get_waiter("endpoint_in_service")
+    
+    try:
+        waiter.wait(
+            EndpointName=endpoint_name,
+            WaiterConfig={"Delay": 15, "MaxAttempts": max(1, timeout // 15)},
+        )
+    except WaiterError as e:
+        response = e.last_response or {}
         
-        if status == "Failed":
+        if response.get("EndpointStatus") == "Failed":
             failure_reason = response.get("FailureReason", "Unknown")
             raise Exception(f"Endpoint deployment failed: {failure_reason}")
         
-        if time.time() - start_time > timeout:
-            raise Exception(f"Endpoint deployment timed out after {timeout} seconds")
+        if "Error" in response:
+            failure_reason = response["Error"].get("Message", "Unknown")
+            raise Exception(f"Endpoint deployment failed: {failure_reason}")
         
-        time.sleep(30)
+        raise Exception(f"Endpoint deployment timed out after {timeout} seconds")
+    
+    print(f"Endpoint is in service: {endpoint_name}")
+    
+    return "InService"
 
 
 if __name__ == "__main__":
@@ -4,105 +4,116 @@
 import argparse
 import json
 import os
-import sys
-import subprocess
 import tarfile
 
-# Install xgboost compatible with the container's pandas 1.1.3
-print("Installing xgboost compatible with container environment...")
-subprocess.check_call([sys.executable, "-m", "pip", "install", "xgboost==1.3.3", "-q"])
-
+# Runs in the SageMaker XGBoost container, which ships xgboost/pandas/sklearn
+import numpy as np
 import pandas as pd
 import xgboost as xgb
-from sklearn.metrics import (
-    accuracy_score,
-    precision_score,
-    recall_score,
-    f1_score,
-    roc_auc_score,
-    confusion_matrix,
-)
+from scipy.stats import rankdata
+from sklearn.metrics import confusion_matrix
+
+
+def _safe_div(numerator, denominator):
+    """Divide, returning 0.0 for a zero denominator (sklearn's zero_division=0)."""
+    return numerator / denominator if denominator else 0.0
+
+
+def _rank_auc(y_true, y_score):
+    """ROC AUC via the Mann-Whitney U statistic (ties get average ranks)."""
+    n_pos = int(y_true.sum())
+    n_neg = len(y_true) - n_pos
+    if n_pos == 0 or n_neg == 0:
+        return 0.0
+    
+    ranks = rankdata(y_score)
+    rank_sum_pos = ranks[y_true == 1].sum().item()
+    return (rank_sum_pos - n_pos * (n_pos + 1) / 2) / (n_pos * n_neg)
 
 
-def evaluate(model_path, test_path, output_path):
+def _metric(value):
+    """Model Monitor style metric entry."""
+    return {"value": value, "standard_deviation": 0.0}
+
+
+def evaluate(model_path, test_path, output_path, data_format="parquet"):
     """Evaluate model on test data."""
     
     print("Loading model...")
     
-    # Extract model
+    # Extract only the model file, streaming through the archive once
     model_tar = os.path.join(model_path, "model.tar.gz")
-    with tarfile.open(model_tar, "r:gz") as tar:
-        tar.extractall(path="/tmp/model")
+    model_file = None
+    with tarfile.open(model_tar, "r|gz") as tar:
+        for member in tar:
+            if member.isfile() and os.path.basename(member.name) == "xgboost-model":
+                tar.extract(member, path="/tmp/model")
+                model_file = os.path.join("/tmp/model", member.name)
+                break
+    
+    if model_file is None:
+        raise FileNotFoundError(f"xgboost-model not found in {model_tar}")
     
     # Load XGBoost model
     model = xgb.Booster()
-    model.load_model("/tmp/model/xgboost-model")
+    model.load_model(model_file)
     
     print("Loading test data...")
     
-    # Load test data
-    test_data = pd.read_csv(
-        os.path.join(test_path, "test.csv"),
-        header=None
-    )
-    
-    # Split features and target
-    y_test = test_data.iloc[:, 0]
-    X_test = test_data.iloc[:, 1:]
-    
-    # Convert to DMatrix
-    dtest = xgb.DMatrix(X_test)
+    # Load test data as float32 (XGBoost's native dtype, no internal cast).
+    # The format is given explicitly, never guessed from which files exist
+    if data_format == "parquet":
+        test_data = pd.read_parquet(
+            os.path.join(test_path, "test.parquet")
+        ).to_numpy(dtype=np.float32)
+    else:
+        test_data = pd.read_csv(
+            os.path.join(test_path, "test.csv"),
+            header=None,
+            dtype=np.float32,
+            engine="c",
+        ).to_numpy()
+    
+    # Split features and target (labels as a plain uint8 array so the
+    # metric functions skip pandas coercion)
+    y_test = test_data[:, 0].astype(np.uint8)
+    X_test = test_data[:, 1:]
     
     print("Making predictions...")
     
-    # Get predictions
-    y_pred_proba = model.predict(dtest)
-    y_pred = (y_pred_proba > 0.5).astype(int)
+    # Predict straight from the float32 array (no DMatrix copy)
+    y_pred_proba = model.inplace_predict(X_test)
+    y_pred = np.empty(y_pred_proba.shape, dtype=np.uint8)
+    np.greater(y_pred_proba, 0.5, out=y_pred.view(bool))
     
     print("Calculating metrics...")
     
-    # Calculate metrics
-    accuracy = accuracy_score(y_test, y_pred)
-    precision = precision_score(y_test, y_pred, average="binary")
-    recall = recall_score(y_test, y_pred, average="binary")
-    f1 = f1_score(y_test, y_pred, average="binary")
+    # Calculate metrics from a single confusion matrix pass
+    # (tolist() yields plain Python ints, so the report needs no casts)
+    cm = confusion_matrix(y_test, y_pred, labels=[0, 1])
+    tn, fp, fn, tp = cm.ravel().tolist()
     
-    try:
-        auc = roc_auc_score(y_test, y_pred_proba)
-    except:
-        auc = 0.0
+    accuracy = _safe_div(tp + tn, tn + fp + fn + tp)
+    precision = _safe_div(tp, tp + fp)
+    recall = _safe_div(tp, tp + fn)
+    f1 = _safe_div(2 * tp, 2 * tp + fp + fn)
     
-    cm = confusion_matrix(y_test, y_pred)
+    auc = _rank_auc(y_test, y_pred_proba)
     
     # Create evaluation report
     report = {
         "classification_metrics": {
-            "accuracy": {
-                "value": float(accuracy),
-                "standard_deviation": 0.0
-            },
-            "precision": {
-                "value": float(precision),
-                "standard_deviation": 0.0
-            },
-            "recall": {
-                "value": float(recall),
-                "standard_deviation": 0.0
-            },
-            "f1_score": {
-                "value": float(f1),
-                "standard_deviation": 0.0
-            },
-            "auc": {
-                "value": float(auc),
-                "standard_deviation": 0.0
-            }
+            "accuracy": _metric(accuracy),
+            "precision": _metric(precision),
+            "recall": _metric(recall),
+            "f1_score": _metric(f1),
+            "auc": _metric(auc)
         },
         "confusion_matrix": {
-            "true_negatives": int(cm[0][0]),
-            "false_positives": int(cm[0][1]),
-            "false_negatives": int(cm[1][0]),
-            "true_positives": int(cm[1][1])
+            "true_negatives": tn,
+            "false_positives": fp,
+            "false_negatives": fn,
+            "true_positives": tp
         }
     }
     
@@ -119,8 +130,8 @@ def evaluate(model_path, test_path, output_path):
     print(f"  F1 Score:  {f1:.4f}")
     print(f"  AUC:       {auc:.4f}")
     print("\nConfusion Matrix:")
-    print(f"  TN: {cm[0][0]}, FP: {cm[0][1]}")
-    print(f"  FN: {cm[1][0]}, TP: {cm[1][1]}")
+    print(f"  TN: {tn}, FP: {fp}")
+    print(f"  FN: {fn}, TP: {tp}")
     print("\nEvaluation complete!")
 
 
@@ -129,7 +140,8 @@ if __name__ == "__main__":
     parser.add_argument("--model-path", type=str, default="/opt/ml/processing/model")
     parser.add_argument("--test-path", type=str, default="/opt/ml/processing/test")
     parser.add_argument("--output-path", type=str, default="/opt/ml/processing/evaluation")
+    parser.add_argument("--format", type=str, choices=["parquet", "csv"], default="parquet")
     
     args = parser.parse_args()
     
-    evaluate(args.model_path, args.test_path, args.output_path)
+    evaluate(args.model_path, args.test_path, args.output_path, args.format)
@@ -2,17 +2,20 @@
 """Setup SageMaker Model Monitor for endpoint."""
 
 import argparse
-import boto3
+import sys
 from datetime import datetime
+from pathlib import Path
 
+# Shared boto3 helpers live with the deployment scripts (same workflow)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "deployment"))
+import _aws
 
 def setup_monitor(endpoint_name, region):
     """Setup Model Monitor for endpoint."""
     
-    sm_client = boto3.client("sagemaker", region_name=region)
-    sts_client = boto3.client("sts")
+    sm_client = _aws.session(region).client("sagemaker", config=_aws.BOTO_CONFIG)
     
-    account_id = sts_client.get_caller_identity()["Account"]
+    account_id = _aws.account_id(region)
     
     # Get endpoint details
     endpoint = sm_client.describe_endpoint(EndpointName=endpoint_name)
@@ -3,7 +3,7 @@
 
 import argparse
 import json
-import boto3
+from pathlib import Path
 from sagemaker.workflow.pipeline import Pipeline
 from sagemaker.workflow.steps import ProcessingStep, TrainingStep, CreateModelStep
 from sagemaker.workflow.step_collections import RegisterModel
@@ -11,12 +11,22 @@ from sagemaker.workflow.conditions import ConditionGreaterThanOrEqualTo
 from sagemaker.workflow.condition_step import ConditionStep
 from sagemaker.workflow.parameters import ParameterInteger, ParameterString
 from sagemaker.workflow.properties import PropertyFile
+from sagemaker.workflow.execution_variables import ExecutionVariables
+from sagemaker.workflow.functions import Join
 from sagemaker.sklearn.processing import SKLearnProcessor
 from sagemaker.processing import ProcessingInput, ProcessingOutput, ScriptProcessor
 from sagemaker.estimator import Estimator
 from sagemaker.inputs import TrainingInput
 from sagemaker.model_metrics import MetricsSource, ModelMetrics
 from sagemaker import get_execution_role
+import _aws
+
+def _deployed_pipeline(sm_client, pipeline_name):
+    """Describe the pipeline as it exists in SageMaker (None if it doesn't)."""
+    try:
+        return sm_client.describe_pipeline(PipelineName=pipeline_name)
+    except sm_client.exceptions.ResourceNotFound:
+        return None
 
 
 def create_pipeline(
@@ -24,26 +34,27 @@ def create_pipeline(
     role,
     project_name,
     bucket=None,
+    force=False,
+    data_format="parquet",
 ):
     """Create SageMaker Pipeline."""
     
     import sagemaker
     
     # Get account ID
-    sts_client = boto3.client('sts', region_name=region)
-    account_id = sts_client.get_caller_identity()['Account']
+    account_id = _aws.account_id(region)
     
     if bucket is None:
         bucket = f"sagemaker-{project_name}-{account_id}"
     
     # Create SageMaker session with explicit bucket
+    boto_session = _aws.session(region)
     sagemaker_session = sagemaker.Session(
-        boto_session=boto3.Session(region_name=region),
+        boto_session=boto_session,
+        sagemaker_client=boto_session.client("sagemaker", config=_aws.BOTO_CONFIG),
         default_bucket=bucket
     )
     
-    sm_client = boto3.client("sagemaker", region_name=region)
-    
     # Pipeline parameters
     processing_instance_type = ParameterString(
         name="ProcessingInstanceType",
@@ -65,6 +76,22 @@ def create_pipeline(
         default_value=f"s3://{bucket}/{project_name}/input/data.csv"
     )
     
+    # Content type of the train/validation/test splits
+    data_content_type = "application/x-parquet" if data_format == "parquet" else "text/csv"
+    
+    # Splits go under a per-execution prefix: processing outputs never delete
+    # old objects, so a shared prefix would mix files from earlier runs
+    # (possibly in the other format) into the training/test channels
+    def split_destination(split):
+        return Join(
+            on="/",
+            values=[
+                f"s3://{bucket}/{project_name}",
+                ExecutionVariables.PIPELINE_EXECUTION_ID,
+                split,
+            ],
+        )
+    
     # Step 1: Data preprocessing
     sklearn_processor = SKLearnProcessor(
         framework_version="1.2-1",
@@ -88,25 +115,28 @@ def create_pipeline(
             ProcessingOutput(
                 output_name="train",
                 source="/opt/ml/processing/train",
-                destination=f"s3://{bucket}/{project_name}/train"
+                destination=split_destination("train")
             ),
             ProcessingOutput(
                 output_name="validation",
                 source="/opt/ml/processing/validation",
-                destination=f"s3://{bucket}/{project_name}/validation"
+                destination=split_destination("validation")
             ),
             ProcessingOutput(
                 output_name="test",
                 source="/opt/ml/processing/test",
-                destination=f"s3://{bucket}/{project_name}/test"
+                destination=split_destination("test")
             ),
         ],
         code="preprocessing/preprocess.py",
+        job_arguments=["--format", data_format],
     )
     
     # Step 2: Model training
+    xgboost_image_uri = f"683313688378.dkr.ecr.{region}.amazonaws.com/sagemaker-xgboost:1.5-1"
+    
     estimator = Estimator(
-        image_uri=f"683313688378.dkr.ecr.{region}.amazonaws.com/sagemaker-xgboost:1.5-1",
+        image_uri=xgboost_image_uri,
         instance_type=training_instance_type,
         instance_count=1,
         output_path=f"s3://{bucket}/{project_name}/models",
@@ -129,18 +159,21 @@ def create_pipeline(
         inputs={
             "train": TrainingInput(
                 s3_data=step_process.properties.ProcessingOutputConfig.Outputs["train"].S3Output.S3Uri,
-                content_type="text/csv"
+                content_type=data_content_type
             ),
             "validation": TrainingInput(
                 s3_data=step_process.properties.ProcessingOutputConfig.Outputs["validation"].S3Output.S3Uri,
-                content_type="text/csv"
+                content_type=data_content_type
             ),
         },
     )
     
     # Step 3: Model evaluation
-    evaluation_processor = SKLearnProcessor(
-        framework_version="1.2-1",
+    # Use the training image so xgboost is already installed (no pip install
+    # at job start) and matches the version that produced the model
+    evaluation_processor = ScriptProcessor(
+        image_uri=xgboost_image_uri,
+        command=["python3"],
         instance_type=processing_instance_type,
         instance_count=1,
         base_job_name=f"{project_name}-evaluate",
@@ -175,12 +208,11 @@ def create_pipeline(
             ),
         ],
         code="evaluation/evaluate.py",
+        job_arguments=["--format", data_format],
         property_files=[evaluation_report],
     )
     
     # Step 4: Register model (conditional)
-    from sagemaker.workflow.functions import Join
-    
     model_metrics = ModelMetrics(
         model_statistics=MetricsSource(
             s3_uri=Join(
@@ -238,15 +270,29 @@ def create_pipeline(
         steps=[step_process, step_train, step_evaluate, step_cond],
     )
     
-    # Create or update pipeline
-    pipeline.upsert(role_arn=role)
+    # Skip the upsert if the deployed pipeline already has this definition
+    # and role (compared against SageMaker itself, not any local state)
+    deployed = None if force else _deployed_pipeline(
+        sagemaker_session.sagemaker_client, pipeline.name
+    )
+    
+    if (
+        deployed is not None
+        and deployed.get("RoleArn") == role
+        and json.loads(deployed["PipelineDefinition"]) == json.loads(pipeline.definition())
+    ):
+        pipeline_arn = deployed["PipelineArn"]
+        print(f"Pipeline definition unchanged, skipping upsert: {pipeline.name}")
+    else:
+        # Create or update pipeline (the Create/UpdatePipeline response carries the ARN)
+        upsert_response = pipeline.upsert(role_arn=role)
+        pipeline_arn = upsert_response["PipelineArn"]
+        print(f"Pipeline created/updated: {pipeline.name}")
     
     # Save pipeline ARN
-    with open("pipeline_arn.txt", "w") as f:
-        f.write(pipeline.describe()["PipelineArn"])
+    Path("pipeline_arn.txt").write_text(pipeline_arn)
     
-    print(f"Pipeline created/updated: {pipeline.name}")
-    print(f"Pipeline ARN: {pipeline.describe()['PipelineArn']}")
+    print(f"Pipeline ARN: {pipeline_arn}")
     
     return pipeline
 
@@ -257,6 +303,8 @@ if __name__ == "__main__":
     parser.add_argument("--role", type=str, required=True)
     parser.add_argument("--project-name", type=str, required=True)
     parser.add_argument("--bucket", type=str, default=None)
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--data-format", type=str, choices=["parquet", "csv"], default="parquet")
     
     args = parser.parse_args()
     
@@ -265,4 +313,6 @@ if __name__ == "__main__":
         role=args.role,
         project_name=args.project_name,
         bucket=args.bucket,
+        force=args.force,
+        data_format=args.data_format,
     )
@@ -3,26 +3,33 @@
 
 import argparse
 import json
-import boto3
+from concurrent.futures import ThreadPoolExecutor
+import _aws
+
+def _list_steps(sm_client, execution_arn):
+    """List all pipeline execution steps (follows pagination)."""
+    paginator = sm_client.get_paginator("list_pipeline_execution_steps")
+    pages = paginator.paginate(PipelineExecutionArn=execution_arn)
+    return list(pages.search("PipelineExecutionSteps[]"))
 
 
 def get_results(execution_arn, region):
     """Get pipeline execution results."""
     
-    sm_client = boto3.client("sagemaker", region_name=region)
+    sm_client = _aws.session(region).client("sagemaker", config=_aws.BOTO_CONFIG)
     
-    # Get execution details
-    response = sm_client.describe_pipeline_execution(
-        PipelineExecutionArn=execution_arn
-    )
+    # Get execution details and pipeline steps concurrently (independent calls)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        execution_future = executor.submit(
+            sm_client.describe_pipeline_execution,
+            PipelineExecutionArn=execution_arn,
+        )
+        steps_future = executor.submit(_list_steps, sm_client, execution_arn)
+        response = execution_future.result()
+        steps = steps_future.result()
     
     status = response["PipelineExecutionStatus"]
     
-    # Get pipeline steps
-    steps_response = sm_client.list_pipeline_execution_steps(
-        PipelineExecutionArn=execution_arn
-    )
-    
     results = {
         "status": status,
         "execution_arn": execution_arn,
@@ -30,7 +37,7 @@ def get_results(execution_arn, region):
     }
     
     # Extract model package ARN if registered
-    for step in steps_response["PipelineExecutionSteps"]:
+    for step in steps:
         step_info = {
             "name": step["StepName"],
             "status": step["StepStatus"]
@@ -69,13 +76,11 @@ def get_results(execution_arn, region):
                     s3_uri = model_stats.get("S3Uri")
                     if s3_uri:
                         # Parse S3 URI and download
-                        import re
-                        match = re.match(r"s3://([^/]+)/(.+)", s3_uri)
-                        if match:
-                            bucket, key = match.groups()
-                            s3_client = boto3.client("s3", region_name=region)
+                        bucket, _, key = s3_uri.removeprefix("s3://").partition("/")
+                        if s3_uri.startswith("s3://") and bucket and key:
+                            s3_client = _aws.session(region).client("s3", config=_aws.BOTO_CONFIG)
                             obj = s3_client.get_object(Bucket=bucket, Key=key)
-                            eval_data = json.loads(obj["Body"].read())
+                            eval_data = json.load(obj["Body"])
                             
                             if "classification_metrics" in eval_data:
                                 results["accuracy"] = eval_data["classification_metrics"]["accuracy"]["value"]
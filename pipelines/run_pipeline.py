@@ -2,24 +2,23 @@
 """Start SageMaker Pipeline execution."""
 
 import argparse
-import boto3
-
+from pathlib import Path
+import _aws
 
 def run_pipeline(pipeline_name, region):
     """Start pipeline execution."""
     
-    sm_client = boto3.client("sagemaker", region_name=region)
+    sm_client = _aws.session(region).client("sagemaker", config=_aws.BOTO_CONFIG)
     
     response = sm_client.start_pipeline_execution(
         PipelineName=pipeline_name,
-        PipelineExecutionDisplayName=f"github-actions-{boto3.client('sts').get_caller_identity()['Account']}",
+        PipelineExecutionDisplayName=f"github-actions-{_aws.account_id(region)}",
     )
     
     execution_arn = response["PipelineExecutionArn"]
     
     # Save execution ARN
-    with open("execution_arn.txt", "w") as f:
-        f.write(execution_arn)
+    Path("execution_arn.txt").write_text(execution_arn)
     
     print(f"Pipeline execution started: {execution_arn}")
     
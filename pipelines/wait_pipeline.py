@@ -3,15 +3,15 @@
 
 import argparse
 import time
-import boto3
-
+import _aws
 
 def wait_pipeline(execution_arn, region, timeout=3600):
     """Wait for pipeline execution to complete."""
     
-    sm_client = boto3.client("sagemaker", region_name=region)
+    sm_client = _aws.session(region).client("sagemaker", config=_aws.BOTO_CONFIG)
     
     start_time = time.time()
+    attempt = 0
     
     while True:
         response = sm_client.describe_pipeline_execution(
@@ -30,10 +30,15 @@ def wait_pipeline(execution_arn, region, timeout=3600):
             
             return status
         
-        if time.time() - start_time > timeout:
+        elapsed = time.time() - start_time
+        if elapsed > timeout:
             raise Exception(f"Pipeline execution timed out after {timeout} seconds")
         
-        time.sleep(30)
+        # Exponential backoff: 5s, 7.5s, 11.25s, ... capped at 60s
+        delay = min(60, 5 * 1.5 ** attempt)
+        attempt += 1
+        
+        time.sleep(min(delay, max(1, timeout - elapsed)))
 
 
 if __name__ == "__main__":
@@ -3,49 +3,273 @@
 
 import argparse
 import os
-import pandas as pd
-from sklearn.model_selection import train_test_split
+import re
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pv
+import pyarrow.parquet as pq
 
+# Split assigned to each input row
+TRAIN, VALIDATION, TEST, DROPPED = 0, 1, 2, 3
 
-def preprocess(input_path, output_path):
-    """Preprocess data and split into train/validation/test sets."""
+# String columns with at most this many distinct values (and fewer than
+# half as many as rows) are stored as categoricals
+MAX_CATEGORIES = 1 << 16
+
+# Input is read in blocks of this many bytes (one record batch per block)
+READ_BLOCK_SIZE = 8 << 20
+
+# Output files are written through a buffer this size, so each batch
+# reaches the disk as a few large writes
+WRITE_BUFFER_SIZE = 8 << 20
+
+
+def _open_batches(input_file, columns=None, column_types=None, block_size=READ_BLOCK_SIZE):
+    """Stream the input CSV as Arrow record batches (one per block_size bytes).
     
-    print(f"Reading data from {input_path}")
+    If columns is given, batches contain only those columns, in that order.
+    column_types maps column names to the Arrow type to parse them as; other
+    columns get the type Arrow infers from the first block.
+    """
+    return pv.open_csv(
+        input_file,
+        read_options=pv.ReadOptions(use_threads=True, block_size=block_size),
+        convert_options=pv.ConvertOptions(
+            include_columns=columns,
+            column_types=column_types,
+            strings_can_be_null=True,  # Empty strings are missing, as in pandas
+        ),
+    )
+
+
+def _valid_rows(batch):
+    """Boolean mask of rows without missing values (null or NaN)."""
+    valid = np.ones(batch.num_rows, dtype=bool)
+    
+    for column in batch.columns:
+        if column.null_count:
+            valid &= column.is_valid().to_numpy(zero_copy_only=False)
+        if pa.types.is_floating(column.type):
+            valid &= ~pc.is_nan(column).fill_null(False).to_numpy(zero_copy_only=False)
+    
+    return valid
+
+
+def _wider_type(arrow_type):
+    """Next type to try for a column that failed to parse as arrow_type."""
+    if pa.types.is_null(arrow_type):
+        return pa.int64()
+    if pa.types.is_integer(arrow_type):
+        return pa.float64()
+    return pa.string()
+
+
+def _update_column_stats(stats, batch):
+    """Track integer ranges and distinct strings seen so far per column."""
+    for name, column in zip(batch.schema.names, batch.columns):
+        if pa.types.is_integer(column.type):
+            batch_range = pc.min_max(column).as_py()
+            if batch_range["min"] is None:
+                continue
+            lo, hi = stats.get(name, (batch_range["min"], batch_range["max"]))
+            stats[name] = (min(lo, batch_range["min"]), max(hi, batch_range["max"]))
+        
+        elif pa.types.is_string(column.type):
+            values = stats.setdefault(name, set())
+            if values is not None:
+                values.update(pc.unique(column).to_pylist())
+                if len(values) > MAX_CATEGORIES:
+                    stats[name] = None  # Too many distinct values to track
+
+
+def _narrow_types(schema, stats, n_rows):
+    """Pick the smallest Arrow type for each column from pass-1 stats.
+    
+    Every column gets an explicit type, so pass 2 never falls back to
+    inferring types from its first block.
+    """
+    column_types = {field.name: field.type for field in schema}
+    
+    for field in schema:
+        if pa.types.is_integer(field.type) and field.name in stats:
+            lo, hi = stats[field.name]
+            for candidate in (pa.int8(), pa.int16(), pa.int32()):
+                info = np.iinfo(candidate.to_pandas_dtype())
+                if info.min <= lo and hi <= info.max:
+                    column_types[field.name] = candidate
+                    break
+        
+        elif pa.types.is_floating(field.type):
+            # XGBoost works in float32, so nothing downstream needs float64
+            column_types[field.name] = pa.float32()
+        
+        elif pa.types.is_string(field.type):
+            values = stats.get(field.name)
+            if values is not None and len(values) < 0.5 * n_rows:
+                column_types[field.name] = pa.dictionary(pa.int32(), pa.string())
+    
+    return column_types
+
+
+def _scan(input_file, block_size=READ_BLOCK_SIZE):
+    """Pass 1: read every row once, keeping only what pass 2 needs.
+    
+    Returns the schema, the mask of rows without missing values, the target
+    (last column) of those rows and per-column stats. Arrow infers types
+    from the first block only, so a column whose values change type later
+    in the file is widened (see _wider_type) and the scan restarted.
+    """
+    column_types = {}
+    
+    while True:
+        reader = _open_batches(input_file, column_types=column_types, block_size=block_size)
+        target = reader.schema.names[-1]  # Assuming last column is target
+        
+        valid_parts = []
+        target_parts = []
+        column_stats = {}
+        try:
+            for batch in reader:
+                _update_column_stats(column_stats, batch)
+                
+                # Handle missing values: drop rows with any. Only a mask is
+                # kept; pass 2 skips these rows instead of materializing a
+                # dropna() copy. Feature transforms go in _transform_batch
+                valid = _valid_rows(batch)
+                valid_parts.append(valid)
+                target_parts.append(batch.column(target).to_numpy(zero_copy_only=False)[valid])
+        except pa.ArrowInvalid as e:
+            match = re.match(r"In CSV column #(\d+)", str(e))
+            if match is None:
+                raise
+            field = reader.schema.field(int(match.group(1)))
+            if _wider_type(field.type) == field.type:
+                raise
+            column_types[field.name] = _wider_type(field.type)
+            print(f"Column {field.name} is not all {field.type}, rescanning it as {column_types[field.name]}")
+            continue
+        
+        return (
+            reader.schema,
+            np.concatenate(valid_parts),
+            np.concatenate(target_parts),
+            column_stats,
+        )
+
+
+def _assign_splits(y, seed=42):
+    """Stratified 70/15/15 split.
     
-    # Read input data
-    df = pd.read_csv(os.path.join(input_path, "data.csv"))
+    Every row gets a seeded random key; rows are ordered by (label, key) in
+    one sort and each label's run is cut at 70% and 85% of its size.
+    """
+    _, label_ids = np.unique(y, return_inverse=True)
+    keys = np.random.default_rng(seed).random(len(y))
+    order = np.lexsort((keys, label_ids))
     
-    print(f"Data shape: {df.shape}")
-    print(f"Columns: {df.columns.tolist()}")
+    counts = np.bincount(label_ids)
+    starts = np.cumsum(counts) - counts
+    sorted_ids = label_ids[order]
     
-    # Basic preprocessing
+    # Position of each row within its label's (shuffled) run
+    rank = np.arange(len(y)) - starts[sorted_ids]
+    n_train = (0.7 * counts).astype(np.int64)[sorted_ids]
+    n_val = (0.15 * counts).astype(np.int64)[sorted_ids]
+    
+    codes = np.empty(len(y), dtype=np.uint8)
+    codes[order] = np.where(
+        rank < n_train, TRAIN, np.where(rank < n_train + n_val, VALIDATION, TEST)
+    )
+    return codes
+
+
+def _sorted_assign_splits(y, seed=42):
+    """Sorted stratification for continuous targets.
+    
+    Rows are ordered by target and cut into groups of 20 neighbours; within
+    each group 14 rows go to train, 3 to validation and 3 to test at random.
+    """
+    rng = np.random.default_rng(seed)
+    pattern = np.repeat(np.array([TRAIN, VALIDATION, TEST], dtype=np.uint8), [14, 3, 3])
+    
+    order = np.argsort(y, kind="stable")
+    n_groups, remainder = divmod(len(order), len(pattern))
+    n_full = n_groups * len(pattern)
+    
+    codes = np.empty(len(y), dtype=np.uint8)
+    codes[order[:n_full]] = rng.permuted(np.tile(pattern, (n_groups, 1)), axis=1).ravel()
+    codes[order[n_full:]] = rng.permutation(pattern)[:remainder]
+    return codes
+
+
+def _transform_batch(batch):
+    """Feature transforms applied to each batch in pass 2, before writing.
+    
+    Must keep one output row per input row (the split masks are per row)
+    and keep the target as the first column. Rows to drop are handled in
+    pass 1 (see _valid_rows) so the split only sees the rows that remain.
+    """
     # TODO: Add your preprocessing logic here
-    # - Handle missing values
     # - Feature engineering
     # - Encoding categorical variables
     # - Scaling/normalization
+    return batch
+
+
+def _open_writer(sink, schema, output_format):
+    """Open a batch writer for one split in the requested format.
     
-    # Example: Drop rows with missing values
-    df = df.dropna()
+    The writer is bound to the (fixed) output schema once, so every batch
+    is serialized by Arrow's native writer without per-row Python work.
+    """
+    if output_format == "parquet":
+        return pq.ParquetWriter(sink, schema, compression="zstd")
     
-    # Split features and target
-    # Assuming last column is target
-    X = df.iloc[:, :-1]
-    y = df.iloc[:, -1]
+    return pv.CSVWriter(sink, schema, write_options=pv.WriteOptions(include_header=False))
+
+
+def _write_split(writer, batch, mask):
+    """Append the rows of batch selected by mask to one split file."""
+    writer.write_batch(batch.filter(pa.array(mask)))
+
+
+def preprocess(
+    input_path,
+    output_path,
+    output_format="parquet",
+    stratify="label",
+    block_size=READ_BLOCK_SIZE,
+):
+    """Preprocess data and split into train/validation/test sets."""
     
-    # Split data: 70% train, 15% validation, 15% test
-    X_train, X_temp, y_train, y_temp = train_test_split(
-        X, y, test_size=0.3, random_state=42, stratify=y
-    )
+    input_file = os.path.join(input_path, "data.csv")
     
-    X_val, X_test, y_val, y_test = train_test_split(
-        X_temp, y_temp, test_size=0.5, random_state=42, stratify=y_temp
-    )
+    print(f"Reading data from {input_path}")
+    
+    # Pass 1: find usable rows and collect the target column only, so
+    # memory stays at one batch plus a few bytes per row
+    schema, valid, y, column_stats = _scan(input_file, block_size)
+    columns = schema.names
+    target = columns[-1]
+    
+    print(f"Data shape: {(len(valid), len(columns))}")
+    print(f"Columns: {columns}")
     
-    # Combine features and target
-    train_data = pd.concat([y_train, X_train], axis=1)
-    val_data = pd.concat([y_val, X_val], axis=1)
-    test_data = pd.concat([y_test, X_test], axis=1)
+    # Shrink dtypes (downcast numerics, categorical strings) so pass 2
+    # parses straight into the narrow types instead of re-inferring them
+    column_types = _narrow_types(schema, column_stats, len(valid))
+    print(f"Column types: { {name: str(t) for name, t in column_types.items()} }")
+    
+    # Split data: 70% train, 15% validation, 15% test, stratified by label
+    # or, for continuous targets, by sorted target value
+    splits = np.full(len(valid), DROPPED, dtype=np.uint8)
+    if stratify == "sorted":
+        splits[valid] = _sorted_assign_splits(y)
+    else:
+        splits[valid] = _assign_splits(y)
     
     # Save processed data
     train_output = os.path.join(output_path, "train")
@@ -56,13 +280,54 @@ def preprocess(input_path, output_path):
     os.makedirs(val_output, exist_ok=True)
     os.makedirs(test_output, exist_ok=True)
     
-    train_data.to_csv(os.path.join(train_output, "train.csv"), index=False, header=False)
-    val_data.to_csv(os.path.join(val_output, "validation.csv"), index=False, header=False)
-    test_data.to_csv(os.path.join(test_output, "test.csv"), index=False, header=False)
+    output_files = {
+        TRAIN: os.path.join(train_output, f"train.{output_format}"),
+        VALIDATION: os.path.join(val_output, f"validation.{output_format}"),
+        TEST: os.path.join(test_output, f"test.{output_format}"),
+    }
+    
+    # Pass 2: stream rows through _transform_batch into the split files;
+    # the reader puts the target column first and batches are written by
+    # Arrow's native writers (no pandas round trip)
+    output_columns = [target] + columns[:-1]
+    batches = _open_batches(input_file, output_columns, column_types, block_size)
+    
+    # Writers are bound to the transformed schema, taken from an empty batch
+    output_schema = _transform_batch(
+        pa.RecordBatch.from_pylist([], schema=batches.schema)
+    ).schema
+    with ExitStack() as stack:
+        # Every sink/writer is registered as soon as it is opened, so all of
+        # them are closed (writers before their sinks) even if a later one fails
+        writers = {}
+        for code, path in output_files.items():
+            sink = stack.enter_context(
+                pa.output_stream(path, buffer_size=WRITE_BUFFER_SIZE)
+            )
+            writers[code] = stack.enter_context(
+                _open_writer(sink, output_schema, output_format)
+            )
+        
+        # The three splits go to separate files and Arrow releases the GIL
+        # while filtering/writing, so each batch's writes run concurrently
+        executor = stack.enter_context(ThreadPoolExecutor(max_workers=len(writers)))
+        offset = 0
+        for batch in batches:
+            codes = splits[offset:offset + batch.num_rows]
+            offset += batch.num_rows
+            batch = _transform_batch(batch)
+            
+            futures = [
+                executor.submit(_write_split, writer, batch, codes == code)
+                for code, writer in writers.items()
+            ]
+            for future in futures:
+                future.result()
     
-    print(f"Train set: {train_data.shape}")
-    print(f"Validation set: {val_data.shape}")
-    print(f"Test set: {test_data.shape}")
+    counts = np.bincount(splits, minlength=4).tolist()
+    print(f"Train set: {(counts[TRAIN], len(output_schema))}")
+    print(f"Validation set: {(counts[VALIDATION], len(output_schema))}")
+    print(f"Test set: {(counts[TEST], len(output_schema))}")
     print("Preprocessing complete!")
 
 
@@ -70,7 +335,9 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--input-path", type=str, default="/opt/ml/processing/input")
     parser.add_argument("--output-path", type=str, default="/opt/ml/processing")
+    parser.add_argument("--format", type=str, choices=["parquet", "csv"], default="parquet")
+    parser.add_argument("--stratify", type=str, choices=["label", "sorted"], default="label")
     
     args = parser.parse_args()
     
-    preprocess(args.input_path, args.output_path)
+    preprocess(args.input_path, args.output_path, args.format, args.stratify)
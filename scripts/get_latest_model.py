@@ -3,6 +3,7 @@
 
 import argparse
 import boto3
+from pathlib import Path
 
 
 def get_latest_model(project_name, region, status="Approved"):
@@ -27,8 +28,7 @@ def get_latest_model(project_name, region, status="Approved"):
     model_package_arn = response["ModelPackageSummaryList"][0]["ModelPackageArn"]
     
     # Save model package ARN
-    with open("model_package_arn.txt", "w") as f:
-        f.write(model_package_arn)
+    Path("model_package_arn.txt").write_text(model_package_arn)
     
     print(f"Latest {status} model: {model_package_arn}")
     
@@ -5,14 +5,34 @@ import argparse
 import json
 import sys
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-def validate_tests(test_results_file, min_accuracy=0.85):
+# Per-sample fields that grow with the number of test cases
+DETAIL_KEYS = ("predictions", "latencies")
+
+
+def _dumps(obj):
+    """Pretty-print JSON, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode("utf-8")
+    return json.dumps(obj, indent=2)
+
+
+def validate_tests(test_results_file, min_accuracy=0.85, verbose=False):
     """Validate test results."""
     
     with open(test_results_file, "r") as f:
         results = json.load(f)
     
-    print(f"Test Results: {json.dumps(results, indent=2)}")
+    # Only the summary is printed unless verbose; per-sample details can be large
+    if verbose:
+        print(f"Test Results: {_dumps(results)}")
+    else:
+        summary = {k: v for k, v in results.items() if k not in DETAIL_KEYS}
+        print(f"Test Results: {_dumps(summary)}")
     
     # Check if tests passed
     if not results.get("success", False):
@@ -39,7 +59,8 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser()
     parser.add_argument("--test-results", type=str, required=True)
     parser.add_argument("--min-accuracy", type=float, default=0.85)
+    parser.add_argument("--verbose", action="store_true")
     
     args = parser.parse_args()
     
-    validate_tests(args.test_results, args.min_accuracy)
+    validate_tests(args.test_results, args.min_accuracy, args.verbose)
@@ -5,6 +5,16 @@ import pytest
 import os
 
 
+def _load_script(name, path):
+    """Import a standalone script (the script directories aren't packages)."""
+    import importlib.util
+    
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
 def test_imports():
     """Test that required packages can be imported."""
     import boto3
@@ -38,8 +48,13 @@ def test_sample_data_format():
     # Check if sample data exists
     assert os.path.exists('sample_data.csv')
     
-    # Load and validate
-    df = pd.read_csv('sample_data.csv')
+    # Load and validate (only the target column is needed)
+    df = pd.read_csv(
+        'sample_data.csv',
+        engine='pyarrow',
+        usecols=['target'],
+        dtype={'target': 'int8'},
+    )
     
     # Should have at least one row
     assert len(df) > 0
@@ -48,7 +63,232 @@ def test_sample_data_format():
     assert 'target' in df.columns
     
     # Target should be binary (0 or 1)
-    assert df['target'].isin([0, 1]).all()
+    assert set(pd.unique(df['target'].to_numpy()).tolist()) <= {0, 1}
+
+
+@pytest.mark.parametrize('output_format', ['parquet', 'csv'])
+def test_preprocess_split(tmp_path, output_format):
+    """Test that preprocessing writes a stratified 70/15/15 split."""
+    import shutil
+    import pandas as pd
+    
+    preprocess = _load_script('preprocess', 'preprocessing/preprocess.py')
+    
+    input_path = tmp_path / 'input'
+    input_path.mkdir()
+    shutil.copy('sample_data.csv', input_path / 'data.csv')
+    
+    preprocess.preprocess(str(input_path), str(tmp_path), output_format)
+    
+    def read_split(name):
+        path = tmp_path / name / f'{name}.{output_format}'
+        if output_format == 'parquet':
+            split = pd.read_parquet(path)
+            split.columns = range(split.shape[1])
+            return split
+        return pd.read_csv(path, header=None)
+    
+    source = pd.read_csv('sample_data.csv')
+    splits = [read_split('train'), read_split('validation'), read_split('test')]
+    
+    # Every row lands in exactly one split, target column first
+    assert sum(len(split) for split in splits) == len(source.dropna())
+    
+    # Each label is cut separately, so sizes may be off by one row per label
+    n_labels = source['target'].nunique()
+    assert abs(len(splits[0]) - 0.7 * len(source)) <= n_labels
+    assert abs(len(splits[1]) - 0.15 * len(source)) <= n_labels
+    for split in splits:
+        assert split.shape[1] == source.shape[1]
+        assert set(split[0]) == {0, 1}
+
+
+def test_preprocess_split_across_batches(tmp_path):
+    """Test preprocessing when the input spans many blocks and a column
+    changes type after the first one."""
+    import numpy as np
+    import pandas as pd
+    
+    preprocess = _load_script('preprocess', 'preprocessing/preprocess.py')
+    
+    rng = np.random.default_rng(0)
+    n = 5000
+    source = pd.DataFrame({
+        'id': np.arange(n),
+        'a': rng.integers(0, 100, n).astype(object),
+        'b': rng.normal(size=n),
+        'target': rng.integers(0, 2, n),
+    })
+    source.loc[n - 10, 'a'] = 1.5  # Integer-looking until well past the first block
+    source.loc[rng.choice(n, 200, replace=False), 'b'] = np.nan
+    
+    input_path = tmp_path / 'input'
+    input_path.mkdir()
+    source.to_csv(input_path / 'data.csv', index=False)
+    
+    preprocess.preprocess(str(input_path), str(tmp_path), 'parquet', block_size=4096)
+    
+    splits = [
+        pd.read_parquet(tmp_path / name / f'{name}.parquet')
+        for name in ('train', 'validation', 'test')
+    ]
+    expected = pd.read_csv(input_path / 'data.csv').dropna()
+    assert expected['a'].dtype == np.float64
+    
+    # Same rows as pandas dropna(), each in exactly one split
+    ids = np.concatenate([split['id'].to_numpy() for split in splits])
+    assert len(ids) == len(expected)
+    assert set(ids) == set(expected['id'])
+    
+    # Rows keep their values (batches and split codes stay aligned)
+    combined = pd.concat(splits).set_index('id').sort_index()
+    expected = expected.set_index('id')
+    assert (combined['target'] == expected['target']).all()
+    assert np.allclose(combined['a'], expected['a'])
+    assert np.allclose(combined['b'], expected['b'], rtol=1e-6)
+    
+    n_labels = expected['target'].nunique()
+    assert abs(len(splits[0]) - 0.7 * len(expected)) <= n_labels
+    assert abs(len(splits[1]) - 0.15 * len(expected)) <= n_labels
+
+
+@pytest.mark.parametrize('n_rows', [2000, 2013])
+def test_sorted_assign_splits(n_rows):
+    """Test sorted stratification for continuous targets."""
+    import numpy as np
+    
+    preprocess = _load_script('preprocess', 'preprocessing/preprocess.py')
+    splits = (preprocess.TRAIN, preprocess.VALIDATION, preprocess.TEST)
+    
+    y = np.random.default_rng(1).lognormal(size=n_rows)
+    codes = preprocess._sorted_assign_splits(y)
+    
+    # Every row (including the remainder past the last full group of 20)
+    # gets exactly one split
+    assert codes.shape == y.shape
+    assert set(np.unique(codes).tolist()) <= set(splits)
+    
+    # Each full group of 20 neighbours is cut 14/3/3
+    order = np.argsort(y, kind='stable')
+    n_full = n_rows // 20 * 20
+    groups = codes[order[:n_full]].reshape(-1, 20)
+    for code, size in zip(splits, (14, 3, 3)):
+        assert ((groups == code).sum(axis=1) == size).all()
+    
+    # The remainder never exceeds the per-group quota of any split
+    remainder = codes[order[n_full:]]
+    for code, size in zip(splits, (14, 3, 3)):
+        assert (remainder == code).sum() <= size
+    
+    # Same seed, same split
+    assert np.array_equal(codes, preprocess._sorted_assign_splits(y))
+    assert not np.array_equal(codes, preprocess._sorted_assign_splits(y, seed=7))
+    
+    # Every split spans the whole target range (one row per group of 20)
+    y_sorted = y[order]
+    for code in splits:
+        assert y[codes == code].min() <= y_sorted[19]
+        assert y[codes == code].max() >= y_sorted[n_full - 20]
+
+
+def test_rank_auc_matches_sklearn():
+    """Test the rank-based AUC against roc_auc_score, including ties."""
+    import numpy as np
+    from sklearn.metrics import roc_auc_score
+    
+    evaluate = _load_script('evaluate', 'evaluation/evaluate.py')
+    
+    rng = np.random.default_rng(0)
+    y_true = rng.integers(0, 2, 500).astype(np.uint8)
+    y_score = np.round(rng.random(500) + 0.3 * y_true, 1).astype(np.float32)
+    
+    assert evaluate._rank_auc(y_true, y_score) == pytest.approx(roc_auc_score(y_true, y_score))
+    
+    # roc_auc_score is undefined for a single class; the report uses 0.0
+    assert evaluate._rank_auc(np.zeros(10, dtype=np.uint8), y_score[:10]) == 0.0
+
+
+@pytest.mark.parametrize('case', ['mixed', 'single_class', 'all_negative'])
+def test_evaluate_matches_sklearn(tmp_path, case):
+    """Test that the evaluation report matches sklearn's metrics."""
+    import json
+    import tarfile
+    import numpy as np
+    import xgboost as xgb
+    from sklearn import metrics
+    
+    evaluate = _load_script('evaluate', 'evaluation/evaluate.py')
+    
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 3, (400, 4)).astype(np.float32)  # Few values -> tied scores
+    y = (X[:, 0] + rng.normal(0, 1, 400) > 1).astype(np.uint8)
+    
+    # A model trained on all-negative labels never predicts the positive class
+    train_labels = np.zeros_like(y) if case == 'all_negative' else y
+    booster = xgb.train(
+        {'objective': 'binary:logistic', 'max_depth': 2},
+        xgb.DMatrix(X, label=train_labels),
+        num_boost_round=5,
+    )
+    if case == 'single_class':
+        y = np.ones_like(y)
+    
+    model_path = tmp_path / 'model'
+    test_path = tmp_path / 'test'
+    model_path.mkdir()
+    test_path.mkdir()
+    booster.save_model(str(tmp_path / 'model.ubj'))
+    with tarfile.open(model_path / 'model.tar.gz', 'w:gz') as tar:
+        tar.add(tmp_path / 'model.ubj', arcname='xgboost-model')
+    np.savetxt(test_path / 'test.csv', np.column_stack([y, X]), delimiter=',', fmt='%g')
+    
+    evaluate.evaluate(str(model_path), str(test_path), str(tmp_path / 'evaluation'), 'csv')
+    report = json.loads((tmp_path / 'evaluation' / 'evaluation.json').read_text())
+    values = {name: m['value'] for name, m in report['classification_metrics'].items()}
+    
+    y_score = booster.inplace_predict(X)
+    y_pred = (y_score > 0.5).astype(np.uint8)
+    if case == 'all_negative':
+        assert not y_pred.any()
+    
+    assert values['accuracy'] == pytest.approx(metrics.accuracy_score(y, y_pred))
+    assert values['precision'] == pytest.approx(metrics.precision_score(y, y_pred, zero_division=0))
+    assert values['recall'] == pytest.approx(metrics.recall_score(y, y_pred, zero_division=0))
+    assert values['f1_score'] == pytest.approx(metrics.f1_score(y, y_pred, zero_division=0))
+    if case == 'single_class':
+        assert values['auc'] == 0.0
+    else:
+        assert values['auc'] == pytest.approx(metrics.roc_auc_score(y, y_score))
+    
+    tn, fp, fn, tp = metrics.confusion_matrix(y, y_pred, labels=[0, 1]).ravel().tolist()
+    assert report['confusion_matrix'] == {
+        'true_negatives': tn,
+        'false_positives': fp,
+        'false_negatives': fn,
+        'true_positives': tp,
+    }
+
+
+@pytest.mark.parametrize('body, batch_size, expected', [
+    (b'0.1\n0.9\n0.3\n', 3, [b'0.1', b'0.9', b'0.3']),  # One prediction per line
+    (b'0.1\r\n0.9\r\n', 2, [b'0.1', b'0.9']),
+    (b'0.1,0.9, 0.3', 3, [b'0.1', b'0.9', b'0.3']),  # Single comma-separated line
+    (b'0.7\n', 1, [b'0.7']),
+])
+def test_split_predictions(body, batch_size, expected):
+    """Test splitting a batched text/csv endpoint response."""
+    endpoint = _load_script('endpoint', 'deployment/tests/test_endpoint.py')
+    
+    assert endpoint._split_predictions(body, batch_size) == expected
+
+
+@pytest.mark.parametrize('body', [b'0.1\n0.9', b'0.1,0.9', b''])
+def test_split_predictions_count_mismatch(body):
+    """Test that a response with the wrong number of predictions is rejected."""
+    endpoint = _load_script('endpoint', 'deployment/tests/test_endpoint.py')
+    
+    with pytest.raises(ValueError, match='Expected 3 predictions'):
+        endpoint._split_predictions(body, 3)
 
 
 if __name__ == "__main__":